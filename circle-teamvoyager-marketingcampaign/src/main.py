@@ -1,12 +1,60 @@
-from crewai import Agent, Task, Crew, Process
+import os
+
+from crewai import Agent, Task, Crew, Process, BaseLLM
 from crewai.llm import LLM  # ✅ CrewAI's wrapper around LiteLLM
+from litellm import Router
 
-# Point CrewAI -> LiteLLM -> Ollama
-ollama_llm = LLM(
-    model="ollama/llama3",                 # ✅ note the provider prefix
-    base_url="http://localhost:11434",     # Ollama default
-    api_key="NA"                           # Ollama doesn’t need it, but field is required
-)
+
+ROUTER_MODEL_NAME = "local-llama"
+
+
+# Same as RouterLLM in crewai-quickstart (src/crewai_quickstart/llm.py);
+# this script runs standalone, so keep the two in sync
+class RouterLLM(BaseLLM):
+    """CrewAI LLM that sends completions through a LiteLLM Router"""
+
+    def __init__(self, router, model=ROUTER_MODEL_NAME, temperature=None, stop=None):
+        super().__init__(model=model, temperature=temperature, stop=stop)
+        self.router = router
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        params = {}
+        if self.temperature is not None:
+            params["temperature"] = self.temperature
+        if self.stop:
+            params["stop"] = self.stop
+
+        response = self.router.completion(model=self.model, messages=messages, **params)
+        return response.choices[0].message.content
+
+
+# Optional: comma-separated Ollama servers to load-balance across
+OLLAMA_HOSTS = [h.strip() for h in os.getenv("OLLAMA_HOSTS", "").split(",") if h.strip()]
+
+if OLLAMA_HOSTS:
+    # Point CrewAI -> LiteLLM Router -> least busy Ollama replica
+    router = Router(
+        model_list=[
+            {
+                "model_name": ROUTER_MODEL_NAME,
+                "litellm_params": {"model": "ollama/llama3", "api_base": host},
+            }
+            for host in OLLAMA_HOSTS
+        ],
+        routing_strategy="least-busy",
+    )
+    ollama_llm = RouterLLM(router)
+else:
+    # Point CrewAI -> LiteLLM -> Ollama
+    ollama_llm = LLM(
+        model="ollama/llama3",                 # ✅ note the provider prefix
+        base_url="http://localhost:11434",     # Ollama default
+        api_key="NA"                           # Ollama doesn’t need it, but field is required
+    )
 
 researcher = Agent(
     role="Researcher",
@@ -1,18 +1,37 @@
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
+from crewai_quickstart.llm import RouterLLM, build_ollama_router
 import os
+import threading
 
 
 @CrewBase
 class CrewaiQuickstartCrew():
     """CrewaiQuickstart crew"""
 
+    _llm = None
+    _llm_lock = threading.Lock()
+
     def __init__(self):
         super().__init__()
-        self.llm = LLM(
-            model=f"ollama/{os.getenv('OLLAMA_MODEL', 'llama3.2')}", 
-            base_url=os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
-        )
+        self.llm = type(self).get_llm()
+
+    @classmethod
+    def get_llm(cls):
+        """Return the LLM shared by all crew instances, creating it on first use"""
+        with cls._llm_lock:
+            if cls._llm is None:
+                model = os.getenv('OLLAMA_MODEL', 'llama3.2')
+                hosts = [h.strip() for h in os.getenv('OLLAMA_HOSTS', '').split(',') if h.strip()]
+                if hosts:
+                    # Balance requests across several Ollama servers
+                    cls._llm = RouterLLM(build_ollama_router(model, hosts))
+                else:
+                    cls._llm = LLM(
+                        model=f"ollama/{model}", 
+                        base_url=os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+                    )
+            return cls._llm
 
     @agent
     def researcher(self) -> Agent:
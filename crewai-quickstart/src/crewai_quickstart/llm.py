@@ -0,0 +1,43 @@
+from crewai import BaseLLM
+from litellm import Router
+
+
+ROUTER_MODEL_NAME = "local-llama"
+
+
+def build_ollama_router(model, hosts):
+    """Create a LiteLLM Router that balances requests across Ollama servers"""
+    return Router(
+        model_list=[
+            {
+                "model_name": ROUTER_MODEL_NAME,
+                "litellm_params": {"model": f"ollama/{model}", "api_base": host},
+            }
+            for host in hosts
+        ],
+        routing_strategy="least-busy",
+    )
+
+
+# circle-teamvoyager-marketingcampaign/src/main.py keeps a standalone copy
+# of this class; change both together
+class RouterLLM(BaseLLM):
+    """CrewAI LLM that sends completions through a LiteLLM Router"""
+
+    def __init__(self, router, model=ROUTER_MODEL_NAME, temperature=None, stop=None):
+        super().__init__(model=model, temperature=temperature, stop=stop)
+        self.router = router
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        params = {}
+        if self.temperature is not None:
+            params["temperature"] = self.temperature
+        if self.stop:
+            params["stop"] = self.stop
+
+        response = self.router.completion(model=self.model, messages=messages, **params)
+        return response.choices[0].message.content
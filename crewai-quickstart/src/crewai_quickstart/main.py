@@ -1,26 +1,58 @@
 #!/usr/bin/env python
+import asyncio
+import re
 import sys
 from dotenv import load_dotenv
 
 from crewai_quickstart.crew import CrewaiQuickstartCrew
 
 
-def run():
+DEFAULT_TOPIC = 'AI LLMs'
+
+
+def run(topic=DEFAULT_TOPIC):
     """
     Run the crew.
     """
     load_dotenv()
-    
+
     inputs = {
-        'topic': 'AI LLMs'
+        'topic': topic
     }
-    
-    if len(sys.argv) > 1:
-        inputs['topic'] = ' '.join(sys.argv[1:])
-    
+
     print(f"Running crew with topic: {inputs['topic']}")
     CrewaiQuickstartCrew().crew().kickoff(inputs=inputs)
 
 
+def run_batch(topics):
+    """
+    Run the crew for several topics concurrently.
+    """
+    load_dotenv()
+
+    print(f"Running crew with topics: {', '.join(topics)}")
+
+    # One crew (and one LLM client) is shared by all kickoffs
+    crew = CrewaiQuickstartCrew().crew()
+    results = asyncio.run(
+        crew.kickoff_for_each_async(inputs=[{'topic': topic} for topic in topics])
+    )
+
+    # Every kickoff writes report.md, so keep a copy of each report per topic
+    for topic, result in zip(topics, results):
+        slug = re.sub(r'[^a-z0-9]+', '_', topic.lower()).strip('_')
+        report_file = f"report_{slug}.md"
+        with open(report_file, 'w') as f:
+            f.write(result.raw)
+        print(f"Saved report for '{topic}' to {report_file}")
+
+    return results
+
+
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    if sys.argv[1:2] == ['batch']:
+        run_batch(sys.argv[2:] or [DEFAULT_TOPIC])
+    elif len(sys.argv) > 1:
+        run(' '.join(sys.argv[1:]))
+    else:
+        run()
@@ -9,11 +9,11 @@ This script tests the calendar integration to ensure:
 """
 
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 load_dotenv()
 
-from smart_email_responder import SmartEmailResponder
+from smart_email_responder import get_calendar_service
 
 def test_calendar_functionality():
     """Test calendar invite creation"""
@@ -21,19 +21,20 @@ def test_calendar_functionality():
     print("🧪 Testing Calendar Invite Functionality...")
     
     try:
-        responder = SmartEmailResponder()
+        calendar_service = get_calendar_service()
         
         # Test 1: List recent calendar events
         print("\n1. Listing recent calendar events:")
         
         # Get events from the last 7 days
-        now = datetime.now()
+        # Timezone-aware, so isoformat() already carries the UTC offset
+        now = datetime.now(timezone.utc)
         week_ago = now - timedelta(days=7)
         
-        events_result = responder.calendar_service.events().list(
+        events_result = calendar_service.events().list(
             calendarId='primary',
-            timeMin=week_ago.isoformat() + 'Z',
-            timeMax=now.isoformat() + 'Z',
+            timeMin=week_ago.isoformat(),
+            timeMax=now.isoformat(),
             maxResults=10,
             singleEvents=True,
             orderBy='startTime'
@@ -53,7 +54,7 @@ def test_calendar_functionality():
         print("\n2. Creating test calendar event with invite:")
         
         # Create event for tomorrow at 2 PM
-        tomorrow = datetime.now() + timedelta(days=1)
+        tomorrow = now + timedelta(days=1)
         start_time = tomorrow.replace(hour=14, minute=0, second=0, microsecond=0)
         end_time = start_time + timedelta(hours=1)
         
@@ -79,7 +80,7 @@ def test_calendar_functionality():
             'status': 'confirmed'
         }
         
-        created_event = responder.calendar_service.events().insert(
+        created_event = calendar_service.events().insert(
             calendarId='primary', 
             body=event,
             sendNotifications=True
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for SmartEmailResponder logic that needs no Gmail, Calendar or
+OpenAI access. Run with: python -m unittest test_smart_email_responder
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import smart_email_responder
+from smart_email_responder import (
+    EmailAnalysis, MeetingRequest, SmartEmailResponder, _compact_body, _parse_clock
+)
+
+
+class _Request:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class _FreeCalendar:
+    """Calendar service whose freebusy queries always report no busy time"""
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        return _Request({'calendars': {'primary': {'busy': []}}})
+
+
+def _calendar_responder():
+    """A responder with only the state that meeting planning uses"""
+    responder = SmartEmailResponder.__new__(SmartEmailResponder)
+    responder.calendar_service = _FreeCalendar()
+    responder._execute = lambda request: request.execute()
+    responder.working_hours = {'start': 9, 'end': 17, 'days': [0, 1, 2, 3, 4]}
+    responder._workdays_mask = 0b11111
+    responder._next_bday = None
+    responder._busy_cache = None
+    responder._booked_slots = []
+    responder._calendar_lock = threading.RLock()
+    return responder
+
+
+def _meeting(date, time):
+    return MeetingRequest(
+        purpose="Discuss the roadmap", preferred_date=date, preferred_time=time,
+        duration_minutes=30, attendees=[]
+    )
+
+
+class MeetingPlanningTest(unittest.TestCase):
+    def test_booked_slot_survives_loading_another_window(self):
+        responder = _calendar_responder()
+
+        first, _ = responder._plan_meeting(_meeting('2030-03-05', '14:00'), 'a@example.com')
+        # Outside the cached window, so the busy intervals are reloaded
+        other, _ = responder._plan_meeting(_meeting('2030-03-04', '10:00'), 'c@example.com')
+        clash, info = responder._plan_meeting(_meeting('2030-03-05', '14:00'), 'd@example.com')
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(other)
+        self.assertIsNone(clash)
+        self.assertIn("not available", info)
+
+
+class _Gmail:
+    """Gmail service listing message IDs in the given (newest first) order"""
+
+    def __init__(self, message_ids):
+        self.message_ids = message_ids
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def list(self, **kwargs):
+        return _Request({'messages': [{'id': message_id} for message_id in self.message_ids]})
+
+
+class UnreadEmailsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = mock.patch.object(
+            smart_email_responder, 'ANALYSIS_DB_PATH', os.path.join(tmp.name, 'analysis.db')
+        )
+        db_path.start()
+        self.addCleanup(db_path.stop)
+
+        self.labels = {'m0': [], 'm1': [], 'm2': [], 'm3': [], 'm4': ['IMPORTANT']}
+        self.body_requests = []
+        responder = SmartEmailResponder.__new__(SmartEmailResponder)
+        responder.gmail_service = _Gmail(list(self.labels))
+        responder._execute = lambda request: request.execute()
+        responder._batch_get_messages = self._get_messages
+        responder._db_lock = threading.Lock()
+        responder._analysis_db = responder._open_analysis_db()
+        self.addCleanup(responder._analysis_db.close)
+        self.responder = responder
+
+    def _get_messages(self, message_ids, format, **kwargs):
+        if format == 'full':
+            self.body_requests.extend(message_ids)
+            return {
+                message_id: {'payload': {'mimeType': 'text/plain', 'body': {}}}
+                for message_id in message_ids
+            }
+        return {
+            message_id: {
+                'labelIds': self.labels[message_id],
+                'payload': {'headers': [
+                    {'name': 'Subject', 'value': f'Subject {message_id}'},
+                    {'name': 'From', 'value': f'{message_id}@example.com'},
+                ]},
+            }
+            for message_id in message_ids
+        }
+
+    def test_cap_counts_only_emails_needing_the_model(self):
+        self.responder._store_draft_ids({'m0': 'd0'})
+        self.responder._store_analyses({'m1': EmailAnalysis(
+            needs_response=False, response_priority='low', email_type='personal',
+            reasoning='', suggested_response=''
+        )})
+
+        emails = self.responder.get_unread_emails(max_analyzed=2)
+
+        # m2-m4 need the model: m4 ranks first (IMPORTANT), m2 wins the tie
+        # with m3 as the newer email, and m3 is deferred
+        self.assertEqual([email['id'] for email in emails], ['m0', 'm1', 'm2', 'm4'])
+        self.assertEqual(sorted(self.body_requests), ['m2', 'm4'])
+
+
+class CompactBodyTest(unittest.TestCase):
+    def test_strips_quotes_and_signature(self):
+        body = "Can we meet?\n> Earlier message\nThanks\n-- \nJane Doe\n555-0100"
+        self.assertEqual(_compact_body(body), "Can we meet?\nThanks")
+
+    def test_keeps_text_after_plain_divider(self):
+        body = "Line one\n--\nLine after double dash separator"
+        self.assertEqual(_compact_body(body), body)
+
+
+class ParseClockTest(unittest.TestCase):
+    def test_formats(self):
+        for time_str, expected in [
+            ('19:00', (19, 0)), ('15:00:00', (15, 0)), ('7pm', (19, 0)),
+            ('7:30 PM', (19, 30)), ('12am', (0, 0)), ('9:15:30am', (9, 15)),
+        ]:
+            with self.subTest(time_str=time_str):
+                self.assertEqual(_parse_clock(time_str), expected)
+
+    def test_rejects_unrecognized(self):
+        with self.assertRaises(ValueError):
+            _parse_clock('afternoon')
+
+
+if __name__ == '__main__':
+    unittest.main()
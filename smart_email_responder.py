@@ -17,53 +17,453 @@ Usage:
 """
 
 import os
-import json
+import re
+import sys
 import base64
-from datetime import datetime, timedelta
-from dataclasses import dataclass
-from typing import List, Optional, Dict
+import bisect
+import functools
+import operator
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from html.parser import HTMLParser
+from itertools import islice
+from typing import List, Optional
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
-# Google APIs
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+# Named explicitly so the logger is the same when run as a script (__main__)
+log = logging.getLogger('smart_email_responder')
 
-# OpenAI
-from openai import OpenAI
+# The Google API and OpenAI client libraries are slow to import, so they are
+# imported where first used; main() can then fail fast on a missing API key
+# or credentials.json without loading them
 
 # Date parsing
 from dateutil import parser as date_parser
 
+# In-process analysis cache
+from cachetools import TTLCache
 
-@dataclass
-class EmailAnalysis:
-    needs_response: bool
-    response_priority: str  # high, medium, low
-    email_type: str  # business, personal, spam, marketing, automated
-    reasoning: str
-    suggested_response: str
-    meeting_request: Optional[Dict] = None
+# Fast typed JSON decoding of model responses
+import msgspec
+
+# Build API clients from the discovery documents bundled with
+# google-api-python-client, so startup never fetches them over the network
+# or probes for a discovery cache
+DISCOVERY_OPTIONS = {'static_discovery': True, 'cache_discovery': False}
+
+GMAIL_SCOPES = (
+    'https://www.googleapis.com/auth/gmail.readonly',
+    'https://www.googleapis.com/auth/gmail.compose',
+)
+CALENDAR_SCOPES = ('https://www.googleapis.com/auth/calendar',)
+
+# Gmail accepts up to 100 calls per batch, but recommends staying at 50 or
+# fewer to avoid per-user rate limiting
+GMAIL_BATCH_SIZE = 50
+
+# Processed emails stay unread, so each run looks at this many of the newest
+# unread emails but sends only the highest-ranked ones (by _priority_score)
+# to the model; the rest are reported as deferred
+UNREAD_SCAN_COUNT = 100
+MAX_ANALYZED_EMAILS = 30
+
+# Emails are processed concurrently: blocking Google API calls run on a
+# bounded thread pool to respect Gmail/Calendar QPS, and in-flight OpenAI
+# requests are capped separately to stay under rate limits
+GOOGLE_API_WORKERS = 8
+OPENAI_CONCURRENCY = 4
+
+# OpenAI requests share one pooled HTTP/2 connection (multiplexed streams)
+# instead of opening a TCP+TLS connection per concurrent request
+OPENAI_MAX_CONNECTIONS = 20
+OPENAI_KEEPALIVE_CONNECTIONS = 10
+
+# Streamed completions are handed on in chunks of this many token deltas,
+# or whatever has arrived after this long
+STREAM_FLUSH_DELTAS = 64
+STREAM_FLUSH_SECONDS = 0.01
+
+# Triage is short-context classification into a strict JSON schema, which a
+# small non-reasoning model handles at a fraction of the latency and cost
+ANALYSIS_MODEL = "gpt-4o-mini"
+
+# Only the start of each email body is sent to the model
+MAX_BODY_CHARS = 800
+
+# Output budget per email in an analysis request, so a runaway response is
+# cut off instead of billed in full (output tokens cost more than input)
+ANALYSIS_MAX_TOKENS_PER_EMAIL = 500
+
+# Several emails are analyzed per OpenAI request so the static instructions
+# are paid for once per batch. Emails are binned by body length so short
+# emails are not held up behind long ones, and longer bodies get smaller
+# batches: (max body chars or None, emails per request)
+ANALYSIS_BINS = [
+    (200, 10),
+    (500, 8),
+    (None, 5),
+]
+
+# Calendar availability is read with one freebusy query per window: the
+# requested day plus the following week, where alternatives are looked for
+BUSY_WINDOW_DAYS = 9
+
+# Analyses are also persisted, so reruns over the same unread emails (e.g.
+# from cron) and repeated newsletters skip the model entirely. Each table
+# maps to (key column, TTL in seconds): by Gmail message ID, and by
+# _analysis_cache_key() content hash
+ANALYSIS_DB_PATH = os.path.expanduser('~/.cache/smart_email/analysis.db')
+ANALYSIS_DB_TABLES = {
+    'analysis': ('mid', 86400),
+    'content_analysis': ('key', 7 * 86400),
+}
+
+# Drafts created per Gmail message ID are remembered for this long, so a
+# rerun over emails that are still unread does not draft them again
+DRAFTS_TTL_SECONDS = 30 * 86400
+
+# Optional semantic cache (OPENAI_SEMANTIC_CACHE): emails whose embedding is
+# close enough to one the model already classified as needing no response
+# (e.g. the same newsletter with different tracking links) reuse that
+# analysis. Only no-response analyses are reused, since a reply or meeting
+# drafted for one email must never be sent for another
+SEMANTIC_CACHE_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_TTL_SECONDS = 7 * 86400
+# Every lookup is scored against every entry, so only the newest are kept
+SEMANTIC_CACHE_MAX_ENTRIES = 500
+
+# Structured output schema for analysis responses, matching AnalysisBatch.
+# The model is constrained to it at decode time, so responses always parse.
+# Keys are generated in schema order, so the classification comes first and
+# a streamed response can be cut short once it is known (_EARLY_NO_RESPONSE_RE)
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "email_analysis_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "idx": {"type": "integer"},
+                            "analysis": {
+                                "type": "object",
+                                "properties": {
+                                    "email_type": {
+                                        "type": "string",
+                                        "enum": ["business", "personal", "spam", "marketing", "automated"]
+                                    },
+                                    "response_priority": {"type": "string", "enum": ["high", "medium", "low"]},
+                                    "needs_response": {"type": "boolean"},
+                                    "reasoning": {"type": "string"},
+                                    "suggested_response": {"type": "string"},
+                                    "meeting_request": {
+                                        "anyOf": [
+                                            {
+                                                "type": "object",
+                                                "properties": {
+                                                    "purpose": {"type": "string"},
+                                                    "meeting_subject": {"type": "string"},
+                                                    "preferred_date": {"type": ["string", "null"]},
+                                                    "preferred_time": {"type": ["string", "null"]},
+                                                    "duration_minutes": {"type": "integer"},
+                                                    "attendees": {"type": "array", "items": {"type": "string"}}
+                                                },
+                                                "required": [
+                                                    "purpose", "meeting_subject", "preferred_date",
+                                                    "preferred_time", "duration_minutes", "attendees"
+                                                ],
+                                                "additionalProperties": False
+                                            },
+                                            {"type": "null"}
+                                        ]
+                                    }
+                                },
+                                "required": [
+                                    "email_type", "response_priority", "needs_response",
+                                    "reasoning", "suggested_response", "meeting_request"
+                                ],
+                                "additionalProperties": False
+                            }
+                        },
+                        "required": ["idx", "analysis"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["results"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Matches the start of a single-email analysis the model has already decided
+# needs no response; the reasoning and empty reply after it are not awaited
+_EARLY_NO_RESPONSE_RE = re.compile(
+    r'"email_type"\s*:\s*"(\w+)"\s*,\s*"response_priority"\s*:\s*"(\w+)"\s*,'
+    r'\s*"needs_response"\s*:\s*false'
+)
 
+# Static instructions for email analysis. This must stay byte-identical
+# across requests (no interpolation) so OpenAI can reuse it as a cached
+# prompt prefix.
+ANALYSIS_SYSTEM_PROMPT = """You are an expert email assistant. Always respond with valid JSON only. No additional text or explanations.
 
-@dataclass
-class MeetingRequest:
+The user message is a JSON array of emails, each with "idx", "subject", "from" and "body" fields. Analyze each email and determine if it needs a response.
+
+ANALYSIS RULES:
+- Marketing/promotional emails = NO response
+- Newsletters/automated notifications = NO response
+- Direct questions/requests = RESPONSE needed
+- Meeting invitations = RESPONSE needed
+- Personal messages from real people = RESPONSE needed
+
+For emails that need responses, write a professional response body (without greeting/closing - those will be added automatically).
+
+IMPORTANT: For meeting requests, extract dates and times exactly as mentioned:
+- If email says "tomorrow", use "tomorrow" as preferred_date
+- If email says "next Tuesday", use "next Tuesday" as preferred_date
+- If email says "7pm" or "19:00", use that exact format as preferred_time
+- Extract attendee email addresses from the email content
+- Write meeting_subject as a concise, specific calendar title in title case (max 60 characters), such as "Q4 Budget Review" or "Contract Discussion"; don't start it with "Meeting:"
+
+Return this exact JSON structure, with one entry in "results" per email and "idx" copied from that email:
+{
+    "results": [
+        {
+            "idx": 0,
+            "analysis": {
+                "email_type": "marketing",
+                "response_priority": "low",
+                "needs_response": false,
+                "reasoning": "This appears to be a promotional/marketing email",
+                "suggested_response": "",
+                "meeting_request": null
+            }
+        }
+    ]
+}
+
+If needs_response is true, provide a professional response in suggested_response field.
+For meeting requests, set meeting_request to the extracted meeting details:
+{"purpose": "", "meeting_subject": "", "preferred_date": null, "preferred_time": null, "duration_minutes": 30, "attendees": []}"""
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collects the visible text of an HTML email body"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self._skip_depth:
+            self._skip_depth -= 1
+    
+    def handle_data(self, data):
+        if not self._skip_depth and data.strip():
+            self._chunks.append(data.strip())
+    
+    def text(self):
+        return ' '.join(self._chunks)
+
+
+class MeetingRequest(msgspec.Struct, frozen=True):
     purpose: str
     preferred_date: Optional[str]
     preferred_time: Optional[str]
     duration_minutes: int
     attendees: List[str]
+    meeting_subject: str = ""  # calendar title suggested by the model
+
+
+class EmailAnalysis(msgspec.Struct, frozen=True):
+    needs_response: bool
+    response_priority: str  # high, medium, low
+    email_type: str  # business, personal, spam, marketing, automated
+    reasoning: str
+    suggested_response: str
+    meeting_request: Optional[MeetingRequest] = None
+
+
+class IndexedAnalysis(msgspec.Struct):
+    """One email's analysis in a model response, tagged with the email's idx"""
+    idx: int
+    analysis: EmailAnalysis
+
+
+class AnalysisBatch(msgspec.Struct):
+    """The model's response to an analysis request"""
+    results: List[IndexedAnalysis]
+
+
+# Reused for every response and stored analysis instead of rebuilding the
+# type-specific decoding plan on each call
+_BATCH_DECODER = msgspec.json.Decoder(AnalysisBatch)
+_ANALYSIS_DECODER = msgspec.json.Decoder(EmailAnalysis)
+_JSON_ENCODER = msgspec.json.Encoder()
+
+
+# Subjects and senders of emails that obviously need no response, so the
+# model is never asked about them
+_SPAM_SUBJECT_RE = re.compile(
+    r'unsubscribe|view in browser|noreply|no-reply|newsletter|promotional', re.I
+)
+_AUTO_SENDER_RE = re.compile(
+    r'(no[-_.]?reply|notifications?@|newsletters?@|mailer-daemon|postmaster@)', re.I
+)
+
+# Subjects that usually ask something of the recipient, ranked ahead of
+# others when there are more unread emails than get analyzed
+_PRIORITY_SUBJECT_RE = re.compile(
+    r'urgent|asap|meeting|call|invoice|deadline|question|request|\?', re.I
+)
+
+# Email subjects too generic to use as a meeting title
+_VAGUE_SUBJECT_RE = re.compile('|'.join(map(re.escape, [
+    'meeting', 'send meeting invite', 'calendar invite', 'schedule meeting',
+    'let\'s meet', 'meeting request', 'invitation', 'catch up', 'chat',
+    'quick call', 'sync', 'touch base', 'follow up', 'let\'s schedule',
+    'schedule a call', 'call', 'discussion', 'talk', 'connect'
+])), re.I)
+
+# Invisible characters that marketing emails use as preheader padding, and
+# runs of whitespace; neither tells the model anything but both cost tokens
+_INVISIBLE_CHARS = dict.fromkeys(map(ord, '\u00ad\u034f\u200b\u200c\u200d\u2060\ufeff'))
+_SPACE_RUN_RE = re.compile(r'[ \t\xa0]+')
+_BLANK_LINES_RE = re.compile(r'\s*\n\s*\n\s*')
+
+# Quoted reply lines and the signature block ("-- " separator line) repeat
+# earlier mail rather than add to it, and long threads are mostly quotes
+_QUOTED_LINE_RE = re.compile(r'(?m)^[ \t]*>.*\n?')
+_SIGNATURE_RE = re.compile(r'(?m)^-- \r?$')
+
+
+def _compact_body(body):
+    """Strip quotes, signature, invisible characters and extra whitespace from an email body"""
+    body = _SIGNATURE_RE.split(_QUOTED_LINE_RE.sub('', body), 1)[0]
+    body = _SPACE_RUN_RE.sub(' ', body.translate(_INVISIBLE_CHARS))
+    return _BLANK_LINES_RE.sub('\n\n', body).strip()
+
+
+# Clock times like "19:00", "15:00:00", "7pm" and "7:00 PM" (spaces removed);
+# seconds are ignored
+_CLOCK_RE = re.compile(r'(\d{1,2})(?::(\d{2})(?::\d{2})?)?(am|pm)?', re.I)
+
+
+def _parse_clock(time_str):
+    """Parse a clock time into (hour, minute), raising ValueError if unrecognized"""
+    match = _CLOCK_RE.fullmatch(time_str.replace(" ", ""))
+    if not match:
+        raise ValueError(f"unrecognized time {time_str!r}")
+    
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    meridiem = (match.group(3) or '').lower()
+    if meridiem == 'pm' and hour != 12:
+        hour += 12
+    elif meridiem == 'am' and hour == 12:
+        hour = 0
+    return hour, minute
+
+
+_OAUTH_FLOW_LOCK = threading.Lock()
+
+
+def _load_credentials(token_file, scopes):
+    """Load OAuth credentials from a token file, refreshing or re-authorizing as needed"""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    
+    creds = None
+    
+    if os.path.exists(token_file):
+        creds = Credentials.from_authorized_user_file(token_file, scopes)
+    
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            # Services are set up concurrently; ask for consent one at a time
+            with _OAUTH_FLOW_LOCK:
+                flow = InstalledAppFlow.from_client_secrets_file('credentials.json', scopes)
+                creds = flow.run_local_server(port=0)
+        
+        with open(token_file, 'w') as token:
+            token.write(creds.to_json())
+    
+    return creds
+
+
+@functools.lru_cache(maxsize=None)
+def _get_service(api, version, token_file, scopes):
+    """Build an API client, shared by every responder in the process.
+    
+    The credentials refresh themselves when used, so the client stays valid
+    for the life of the process.
+    """
+    from googleapiclient.discovery import build
+    
+    creds = _load_credentials(token_file, list(scopes))
+    return build(api, version, credentials=creds, **DISCOVERY_OPTIONS)
+
+
+def get_gmail_service():
+    """Gmail API client authorized from gmail_token.json"""
+    return _get_service('gmail', 'v1', 'gmail_token.json', GMAIL_SCOPES)
+
+
+def get_calendar_service():
+    """Calendar API client authorized from calendar_token.json.
+    
+    Scripts that only need the calendar can use this instead of building a
+    full SmartEmailResponder, which also authorizes Gmail and OpenAI.
+    """
+    return _get_service('calendar', 'v3', 'calendar_token.json', CALENDAR_SCOPES)
 
 
 class SmartEmailResponder:
     def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.gmail_service = self._setup_gmail()
-        self.calendar_service = self._setup_calendar()
+        # Concurrency primitives for run()
+        self._google_pool = ThreadPoolExecutor(
+            max_workers=GOOGLE_API_WORKERS, thread_name_prefix='google-api'
+        )
+        self._thread_local = threading.local()
+        self._openai_semaphore = None
+        self._openai_loop = None
+        
+        # Gmail and Calendar setup (token files, refreshes, client builds)
+        # are independent, so they run side by side while the OpenAI client
+        # is created here
+        gmail_future = self._google_pool.submit(self._setup_gmail)
+        calendar_future = self._google_pool.submit(self._setup_calendar)
+        self.async_openai_client = self._make_openai_client()
+        self.stream_completions = os.getenv('OPENAI_STREAM', 'false').lower() in ('1', 'true', 'yes')
+        self.semantic_cache = os.getenv('OPENAI_SEMANTIC_CACHE', 'false').lower() in ('1', 'true', 'yes')
+        self.gmail_service = gmail_future.result()
+        self.calendar_service = calendar_future.result()
         
         # Working hours and availability settings
         self.working_hours = {
@@ -71,218 +471,763 @@ class SmartEmailResponder:
             'end': 17,   # 5 PM
             'days': [0, 1, 2, 3, 4]  # Monday to Friday (0=Monday)
         }
-    
-    def _setup_gmail(self):
-        """Setup Gmail API with read/write permissions"""
-        scopes = [
-            'https://www.googleapis.com/auth/gmail.readonly',
-            'https://www.googleapis.com/auth/gmail.compose'
-        ]
-        creds = None
+        # Bit d is set when weekday d is a working day
+        self._workdays_mask = sum(1 << d for d in self.working_hours['days'])
+        self._next_bday = None
+        self._llm_calls_saved = 0
         
-        if os.path.exists('gmail_token.json'):
-            creds = Credentials.from_authorized_user_file('gmail_token.json', scopes)
+        # Analyses of recently seen emails, keyed by _analysis_cache_key()
+        self._analysis_cache = TTLCache(maxsize=1024, ttl=3600)
+        self._db_lock = threading.Lock()
+        self._analysis_db = self._open_analysis_db()
+        self._semantic_entries = None  # [(embedding, EmailAnalysis)], loaded on first use
         
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file('credentials.json', scopes)
-                creds = flow.run_local_server(port=0)
+        # Busy calendar intervals as (window_start, window_end, starts, ends):
+        # the starts and ends of sorted, non-overlapping busy intervals, as
+        # naive UTC datetimes, so slots can be checked by bisection
+        self._busy_cache = None
+        # Slots booked during this run, which a freebusy query made before
+        # their events are inserted does not report
+        self._booked_slots = []
+        self._calendar_lock = threading.RLock()
+    
+    def _open_analysis_db(self):
+        """Open the persistent analysis store, or None if it is unavailable"""
+        try:
+            os.makedirs(os.path.dirname(ANALYSIS_DB_PATH), exist_ok=True)
+            db = sqlite3.connect(ANALYSIS_DB_PATH, check_same_thread=False)
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS analysis('
+                'mid TEXT PRIMARY KEY, json BLOB, ts INTEGER)'
+            )
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS content_analysis('
+                'key BLOB PRIMARY KEY, json BLOB, ts INTEGER)'
+            )
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS drafts('
+                'mid TEXT PRIMARY KEY, draft_id TEXT, ts INTEGER)'
+            )
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS semantic_analysis('
+                'id INTEGER PRIMARY KEY, embedding BLOB, json BLOB, ts INTEGER)'
+            )
             
-            with open('gmail_token.json', 'w') as token:
-                token.write(creds.to_json())
+            # Prune expired rows so the store does not grow without bound
+            now = int(time.time())
+            for table, (_, ttl) in ANALYSIS_DB_TABLES.items():
+                db.execute(f'DELETE FROM {table} WHERE ts <= ?', (now - ttl,))
+            db.execute('DELETE FROM drafts WHERE ts <= ?', (now - DRAFTS_TTL_SECONDS,))
+            db.execute(
+                'DELETE FROM semantic_analysis WHERE ts <= ?', (now - SEMANTIC_CACHE_TTL_SECONDS,)
+            )
+            db.execute(
+                'DELETE FROM semantic_analysis WHERE id NOT IN '
+                '(SELECT id FROM semantic_analysis ORDER BY id DESC LIMIT ?)',
+                (SEMANTIC_CACHE_MAX_ENTRIES,)
+            )
+            db.commit()
+            return db
+        except (OSError, sqlite3.Error) as e:
+            log.warning(f"⚠️ Analysis store unavailable, continuing without it: {e}")
+            return None
+    
+    def _load_stored_analyses(self, keys, table='analysis'):
+        """Fetch unexpired stored analyses from a table as {key: EmailAnalysis}"""
+        if self._analysis_db is None or not keys:
+            return {}
+        
+        key_column, ttl = ANALYSIS_DB_TABLES[table]
+        placeholders = ','.join('?' * len(keys))
+        min_ts = int(time.time()) - ttl
+        try:
+            with self._db_lock:
+                rows = self._analysis_db.execute(
+                    f'SELECT {key_column}, json FROM {table} '
+                    f'WHERE {key_column} IN ({placeholders}) AND ts > ?',
+                    [*keys, min_ts]
+                ).fetchall()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Could not read stored analyses: {e}")
+            return {}
+        
+        stored = {}
+        for key, data in rows:
+            try:
+                stored[key] = _ANALYSIS_DECODER.decode(data)
+            except msgspec.DecodeError:
+                continue
+        return stored
+    
+    def _store_analyses(self, analyses, table='analysis'):
+        """Persist {key: EmailAnalysis} to a table for later runs"""
+        if self._analysis_db is None or not analyses:
+            return
+        
+        key_column = ANALYSIS_DB_TABLES[table][0]
+        now = int(time.time())
+        rows = [(key, _JSON_ENCODER.encode(analysis), now) for key, analysis in analyses.items()]
+        try:
+            with self._db_lock:
+                self._analysis_db.executemany(
+                    f'INSERT OR REPLACE INTO {table}({key_column}, json, ts) VALUES (?, ?, ?)', rows
+                )
+                self._analysis_db.commit()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Could not store analyses: {e}")
+    
+    def _load_draft_ids(self, message_ids):
+        """Fetch drafts already created for messages as {message_id: draft_id}"""
+        if self._analysis_db is None or not message_ids:
+            return {}
+        
+        placeholders = ','.join('?' * len(message_ids))
+        min_ts = int(time.time()) - DRAFTS_TTL_SECONDS
+        try:
+            with self._db_lock:
+                return dict(self._analysis_db.execute(
+                    f'SELECT mid, draft_id FROM drafts WHERE mid IN ({placeholders}) AND ts > ?',
+                    [*message_ids, min_ts]
+                ).fetchall())
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Could not read stored drafts: {e}")
+            return {}
+    
+    def _store_draft_ids(self, draft_ids):
+        """Remember {message_id: draft_id} for drafts created this run"""
+        if self._analysis_db is None or not draft_ids:
+            return
         
-        return build('gmail', 'v1', credentials=creds)
+        now = int(time.time())
+        try:
+            with self._db_lock:
+                self._analysis_db.executemany(
+                    'INSERT OR REPLACE INTO drafts(mid, draft_id, ts) VALUES (?, ?, ?)',
+                    [(mid, draft_id, now) for mid, draft_id in draft_ids.items()]
+                )
+                self._analysis_db.commit()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Could not store drafts: {e}")
+    
+    def _setup_gmail(self):
+        """Setup Gmail API with read/write permissions"""
+        return get_gmail_service()
     
     def _setup_calendar(self):
         """Setup Calendar API connection"""
-        scopes = ['https://www.googleapis.com/auth/calendar']
-        creds = None
+        return get_calendar_service()
+    
+    def _thread_http(self, credentials):
+        """Get this thread's authorized Http object for the given credentials"""
+        https = getattr(self._thread_local, 'https', None)
+        if https is None:
+            https = self._thread_local.https = {}
         
-        if os.path.exists('calendar_token.json'):
-            creds = Credentials.from_authorized_user_file('calendar_token.json', scopes)
+        http = https.get(id(credentials))
+        if http is None:
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.http import build_http
+            http = https[id(credentials)] = AuthorizedHttp(credentials, http=build_http())
+        return http
+    
+    def _execute(self, request):
+        """Execute a Google API request on the calling thread's own connection.
         
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+        httplib2 connections are not thread-safe, so requests issued from the
+        worker pool must not share the service's default Http object.
+        """
+        return request.execute(http=self._thread_http(request.http.credentials))
+    
+    def _execute_batch(self, service, requests):
+        """Execute {request id: request} as batch requests on this thread's connection.
+        
+        Returns {request id: response}; requests that failed are logged and
+        left out.
+        """
+        responses = {}
+        
+        def collect(request_id, response, exception):
+            if exception is not None:
+                log.error(f"Error in batch request {request_id}: {exception}")
             else:
-                flow = InstalledAppFlow.from_client_secrets_file('credentials.json', scopes)
-                creds = flow.run_local_server(port=0)
-            
-            with open('calendar_token.json', 'w') as token:
-                token.write(creds.to_json())
+                responses[request_id] = response
+        
+        request_ids = list(requests)
+        http = self._thread_http(requests[request_ids[0]].http.credentials)
+        
+        for start in range(0, len(request_ids), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for request_id in request_ids[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(requests[request_id], request_id=request_id)
+            try:
+                batch.execute(http=http)
+            except Exception as e:
+                log.error(f"Error executing batch request: {e}")
+        
+        return responses
+    
+    async def _run_blocking(self, func, *args):
+        """Run a blocking function on the Google API worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._google_pool, func, *args)
+    
+    def _openai_slot(self):
+        """Semaphore bounding concurrent OpenAI requests on the running loop.
         
-        return build('calendar', 'v3', credentials=creds)
+        The OpenAI client's pooled connections belong to the loop that first
+        used them, so a new loop (e.g. each asyncio.run()) also gets a new client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._openai_loop is not loop:
+            if self._openai_loop is not None or self.async_openai_client is None:
+                self.async_openai_client = self._make_openai_client()
+            self._openai_semaphore = asyncio.Semaphore(OPENAI_CONCURRENCY)
+            self._openai_loop = loop
+        return self._openai_semaphore
     
-    def get_unread_emails(self, max_count=20):
-        """Get unread emails from Gmail"""
+    async def _close_openai_client(self):
+        """Close the OpenAI client's connections if they belong to the running loop"""
+        if self._openai_loop is asyncio.get_running_loop():
+            await self.async_openai_client.close()
+            self.async_openai_client = None
+            self._openai_loop = None
+    
+    def _make_openai_client(self):
+        """Create an async OpenAI client that pools requests over HTTP/2"""
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+        return AsyncOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            http_client=DefaultAsyncHttpxClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_KEEPALIVE_CONNECTIONS,
+                ),
+            ),
+        )
+    
+    def get_unread_emails(self, max_count=UNREAD_SCAN_COUNT, max_analyzed=MAX_ANALYZED_EMAILS):
+        """Get unread emails from Gmail, leaving out lower-priority ones beyond max_analyzed"""
         try:
-            results = self.gmail_service.users().messages().list(
+            results = self._execute(self.gmail_service.users().messages().list(
                 userId='me', 
                 maxResults=max_count, 
-                q='is:unread in:inbox'
-            ).execute()
+                q='is:unread in:inbox',
+                fields='messages/id'
+            ))
+            
+            message_ids = [message['id'] for message in results.get('messages', [])]
+            
+            # Stage 1: fetch only the headers the prefilter needs
+            messages = self._batch_get_messages(
+                message_ids, format='metadata',
+                metadataHeaders=['Subject', 'From', 'Date', 'List-Unsubscribe', 'Auto-Submitted'],
+                fields='threadId,labelIds,payload/headers'
+            )
             
             emails = []
-            for message in results.get('messages', []):
-                email_data = self.gmail_service.users().messages().get(
-                    userId='me', id=message['id']
-                ).execute()
+            for message_id in message_ids:
+                email_data = messages.get(message_id)
+                if email_data is None:
+                    continue
                 
                 # Extract email details
-                headers = email_data['payload'].get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-                sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
-                date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-                body = self._extract_body(email_data['payload'])
+                headers = self._extract_headers(
+                    email_data['payload'].get('headers', []),
+                    ('Subject', 'From', 'Date', 'List-Unsubscribe', 'Auto-Submitted')
+                )
                 
                 emails.append({
-                    'id': message['id'],
-                    'subject': subject,
-                    'sender': sender,
-                    'date': date,
-                    'body': body,
-                    'thread_id': email_data.get('threadId')
+                    'id': message_id,
+                    'subject': headers['Subject'],
+                    'sender': headers['From'],
+                    'date': headers['Date'],
+                    'list_unsubscribe': bool(headers['List-Unsubscribe']),
+                    # RFC 3834: anything but "no" marks an automatic message
+                    'auto_submitted': headers['Auto-Submitted'].strip().lower() not in ('', 'no'),
+                    'body': '',
+                    'thread_id': email_data.get('threadId'),
+                    'labels': email_data.get('labelIds', [])
                 })
             
+            # Emails the prefilter settles, drafted on an earlier run or with
+            # a stored analysis cost no model call; of the rest, only the
+            # highest-ranked are analyzed (ties keep newest first)
+            candidates = [email for email in emails if self._prefilter(email) is None]
+            drafted = self._load_draft_ids([email['id'] for email in candidates])
+            stored = self._load_stored_analyses(
+                [email['id'] for email in candidates if email['id'] not in drafted]
+            )
+            needs_model = [
+                email for email in candidates
+                if email['id'] not in drafted and email['id'] not in stored
+            ]
+            if len(needs_model) > max_analyzed:
+                needs_model.sort(key=self._priority_score, reverse=True)
+                deferred = needs_model[max_analyzed:]
+                needs_model = needs_model[:max_analyzed]
+                self._log_block(
+                    f"⏭️ Deferred {len(deferred)} lower-priority emails:",
+                    *(f"  • {email['subject'][:50]}" for email in deferred)
+                )
+                deferred_ids = {email['id'] for email in deferred}
+                emails = [email for email in emails if email['id'] not in deferred_ids]
+            
+            # Stage 2: fetch full bodies only for emails the model will see,
+            # or that a stored analysis says to answer
+            needs_body = [email['id'] for email in needs_model] + [
+                message_id for message_id, analysis in stored.items() if analysis.needs_response
+            ]
+            # (only the MIME tree is needed here; headers were read in stage 1)
+            full_messages = self._batch_get_messages(
+                needs_body, format='full', fields='payload(mimeType,body/data,parts)'
+            )
+            for email in emails:
+                email_data = full_messages.get(email['id'])
+                if email_data is not None:
+                    email['body'] = self._extract_body(email_data['payload'])
+            
             return emails
         except Exception as e:
-            print(f"Error getting emails: {e}")
+            log.error(f"Error getting emails: {e}")
             return []
     
+    def _priority_score(self, email):
+        """Rank an email for analysis from its Gmail labels and subject alone"""
+        labels = email['labels']
+        return (
+            2 * ('IMPORTANT' in labels)
+            + 2 * ('STARRED' in labels)
+            + bool(_PRIORITY_SUBJECT_RE.search(email['subject']))
+        )
+    
+    def _batch_get_messages(self, message_ids, **get_kwargs):
+        """Fetch messages with Gmail batch requests, keyed by message ID"""
+        if not message_ids:
+            return {}
+        
+        messages = self._execute_batch(self.gmail_service, {
+            message_id: self.gmail_service.users().messages().get(
+                userId='me', id=message_id, **get_kwargs
+            )
+            for message_id in message_ids
+        })
+        
+        # Retry anything the batch could not deliver (e.g. per-message rate limits)
+        for message_id in message_ids:
+            if message_id in messages:
+                continue
+            try:
+                messages[message_id] = self._execute(self.gmail_service.users().messages().get(
+                    userId='me', id=message_id, **get_kwargs
+                ))
+            except Exception as e:
+                log.error(f"Error getting email {message_id}: {e}")
+        
+        return messages
+    
+    def _extract_headers(self, headers, wanted=('Subject', 'From', 'Date')):
+        """Map each wanted header name to its first value ('' if missing) in one pass"""
+        found = dict.fromkeys(wanted, '')
+        for header in reversed(headers):
+            if header['name'] in found:
+                found[header['name']] = header['value']
+        return found
+    
     def _extract_body(self, payload):
-        """Extract text from email payload"""
-        body = ''
-        
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body']['data']
-                    body = base64.urlsafe_b64decode(data).decode('utf-8')
-                    break
-        elif payload['mimeType'] == 'text/plain':
-            data = payload['body']['data']
-            body = base64.urlsafe_b64decode(data).decode('utf-8')
+        """Extract text from email payload, preferring text/plain over HTML"""
+        html_part = None
         
-        return body
+        # Walk the MIME tree depth-first in document order, so text nested in
+        # multipart/alternative or multipart/mixed parts is found too
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            if part.get('parts'):
+                stack.extend(reversed(part['parts']))
+                continue
+            if not part.get('body', {}).get('data'):
+                continue
+            if part.get('mimeType') == 'text/plain':
+                return self._decode_body_data(part['body']['data'])
+            if part.get('mimeType') == 'text/html' and html_part is None:
+                html_part = part
+        
+        # Only strip HTML when there is no plain text alternative
+        if html_part is not None:
+            extractor = _HTMLTextExtractor()
+            extractor.feed(self._decode_body_data(html_part['body']['data']))
+            extractor.close()
+            return extractor.text()
+        
+        return ''
+    
+    def _decode_body_data(self, data):
+        """Decode a base64url message body into text"""
+        return base64.urlsafe_b64decode(data.encode('ascii')).decode('utf-8', errors='replace')
     
-    def analyze_email_with_reasoning(self, email):
+    async def analyze_email_with_reasoning(self, email):
         """Use AI with reasoning techniques to analyze if email needs response"""
+        analyses = await self.analyze_emails_batch([email])
+        return analyses[0]
+    
+    async def analyze_emails_batch(self, emails):
+        """Analyze several emails with a single AI request, in input order"""
+        analyses = [self._prefilter(email) for email in emails]
+        
+        stored = self._load_stored_analyses(
+            [email['id'] for email, analysis in zip(emails, analyses)
+             if analysis is None and email.get('id')]
+        )
+        
+        cache_keys = {}
+        for idx, email in enumerate(emails):
+            if analyses[idx] is None:
+                analyses[idx] = stored.get(email.get('id'))
+            if analyses[idx] is None:
+                cache_keys[idx] = self._analysis_cache_key(email)
+                analyses[idx] = self._analysis_cache.get(cache_keys[idx])
         
-        reasoning_prompt = f"""
-        Analyze this email and determine if it needs a response. Return ONLY valid JSON.
-
-        EMAIL:
-        Subject: {email['subject']}
-        From: {email['sender']}
-        Body: {email['body'][:800]}
-
-        ANALYSIS RULES:
-        - Marketing/promotional emails = NO response
-        - Newsletters/automated notifications = NO response  
-        - Direct questions/requests = RESPONSE needed
-        - Meeting invitations = RESPONSE needed
-        - Personal messages from real people = RESPONSE needed
-
-        For emails that need responses, write a professional response body (without greeting/closing - those will be added automatically).
-
-        IMPORTANT: For meeting requests, extract dates and times exactly as mentioned:
-        - If email says "tomorrow", use "tomorrow" as preferred_date
-        - If email says "next Tuesday", use "next Tuesday" as preferred_date  
-        - If email says "7pm" or "19:00", use that exact format as preferred_time
-        - Extract attendee email addresses from the email content
-
-        Return this exact JSON structure:
-        {{
-            "needs_response": false,
-            "response_priority": "low",
-            "email_type": "marketing",
-            "reasoning": "This appears to be a promotional/marketing email",
-            "suggested_response": "",
-            "meeting_request": {{
-                "has_meeting_request": false,
-                "purpose": "",
-                "preferred_date": null,
-                "preferred_time": null,
-                "duration_minutes": 30,
-                "attendees": []
-            }}
-        }}
-
-        If needs_response is true, provide a professional response in suggested_response field.
-        For meeting requests, extract meeting details and set has_meeting_request to true.
+        stored = self._load_stored_analyses(
+            [cache_keys[idx] for idx, analysis in enumerate(analyses) if analysis is None],
+            table='content_analysis'
+        )
+        for idx, analysis in enumerate(analyses):
+            if analysis is None and cache_keys[idx] in stored:
+                analyses[idx] = self._analysis_cache[cache_keys[idx]] = stored[cache_keys[idx]]
+        
+        pending = [idx for idx, analysis in enumerate(analyses) if analysis is None]
+        embeddings = {}
+        if self.semantic_cache and pending:
+            embeddings = await self._semantic_lookup(emails, analyses, pending)
+            pending = [idx for idx in pending if analyses[idx] is None]
+        self._llm_calls_saved += len(emails) - len(pending)
+        
+        if pending:
+            model_analyses = await self._analyze_with_model([emails[idx] for idx in pending])
+            by_message, by_content, by_embedding = {}, {}, []
+            for idx, analysis in zip(pending, model_analyses):
+                if analysis is None:
+                    analysis = self._fallback_analysis()
+                else:
+                    self._analysis_cache[cache_keys[idx]] = analysis
+                    by_content[cache_keys[idx]] = analysis
+                    if emails[idx].get('id'):
+                        by_message[emails[idx]['id']] = analysis
+                    if (idx in embeddings and not analysis.needs_response
+                            and analysis.meeting_request is None):
+                        by_embedding.append((embeddings[idx], analysis))
+                analyses[idx] = analysis
+            self._store_analyses(by_message)
+            self._store_analyses(by_content, table='content_analysis')
+            self._store_semantic(by_embedding)
+        
+        return analyses
+    
+    async def _semantic_lookup(self, emails, analyses, pending):
+        """Fill in analyses of pending emails similar to ones seen before.
+        
+        Returns {idx: embedding} for the emails still without an analysis,
+        so their model results can be added to the semantic cache.
         """
+        try:
+            async with self._openai_slot():
+                response = await self.async_openai_client.embeddings.create(
+                    model=SEMANTIC_CACHE_MODEL,
+                    input=[
+                        f"{emails[idx]['subject']}\n{_compact_body(emails[idx]['body'])[:500]}"
+                        for idx in pending
+                    ]
+                )
+        except Exception as e:
+            log.warning(f"⚠️ Semantic cache lookup failed: {e}")
+            return {}
+        
+        embeddings = [array('f', item.embedding) for item in response.data]
+        # Scoring is CPU-bound, so it runs off the event loop, against a
+        # snapshot that other batches' stores can't change underneath it
+        matches = await self._run_blocking(
+            self._best_semantic_matches, embeddings, list(self._load_semantic_entries())
+        )
+        
+        misses = {}
+        for idx, embedding, match in zip(pending, embeddings, matches):
+            if match is not None:
+                analyses[idx] = match
+            else:
+                misses[idx] = embedding
+        return misses
+    
+    def _best_semantic_matches(self, embeddings, entries):
+        """Find each embedding's cached analysis at or above the similarity threshold, or None"""
+        matches = []
+        for embedding in embeddings:
+            # OpenAI embeddings are unit length, so the dot product is the
+            # cosine similarity
+            best_score, best_analysis = 0.0, None
+            for cached, analysis in entries:
+                score = sum(map(operator.mul, embedding, cached))
+                if score > best_score:
+                    best_score, best_analysis = score, analysis
+            matches.append(best_analysis if best_score >= SEMANTIC_CACHE_THRESHOLD else None)
+        return matches
+    
+    def _load_semantic_entries(self):
+        """Load unexpired semantic cache entries, once per responder"""
+        if self._semantic_entries is not None:
+            return self._semantic_entries
         
+        self._semantic_entries = []
+        if self._analysis_db is None:
+            return self._semantic_entries
+        
+        min_ts = int(time.time()) - SEMANTIC_CACHE_TTL_SECONDS
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert email assistant. Always respond with valid JSON only. No additional text or explanations."},
-                    {"role": "user", "content": reasoning_prompt}
-                ],
-                temperature=0.1
-            )
-            
-            response_text = response.choices[0].message.content.strip()
-            
-            # Try to extract JSON if it's wrapped in markdown
-            if response_text.startswith('```json'):
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif response_text.startswith('```'):
-                response_text = response_text.split('```')[1].split('```')[0].strip()
-            
-            result = json.loads(response_text)
-            
-            meeting_request = None
-            if result.get('meeting_request', {}).get('has_meeting_request'):
-                meeting_data = result['meeting_request']
-                meeting_request = MeetingRequest(
-                    purpose=meeting_data.get('purpose', ''),
-                    preferred_date=meeting_data.get('preferred_date'),
-                    preferred_time=meeting_data.get('preferred_time'),
-                    duration_minutes=meeting_data.get('duration_minutes', 30),
-                    attendees=meeting_data.get('attendees', [])
+            with self._db_lock:
+                rows = self._analysis_db.execute(
+                    'SELECT embedding, json FROM semantic_analysis WHERE ts > ? '
+                    'ORDER BY id DESC LIMIT ?', (min_ts, SEMANTIC_CACHE_MAX_ENTRIES)
+                ).fetchall()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Could not read semantic cache: {e}")
+            return self._semantic_entries
+        
+        # Oldest first, so trimming from the front drops the oldest entries
+        for data, analysis in reversed(rows):
+            embedding = array('f')
+            embedding.frombytes(data)
+            try:
+                self._semantic_entries.append(
+                    (embedding, _ANALYSIS_DECODER.decode(analysis))
                 )
-            
+            except msgspec.DecodeError:
+                continue
+        return self._semantic_entries
+    
+    def _store_semantic(self, entries):
+        """Add [(embedding, EmailAnalysis)] to the semantic cache"""
+        if not entries:
+            return
+        cached = self._load_semantic_entries()
+        cached.extend(entries)
+        del cached[:-SEMANTIC_CACHE_MAX_ENTRIES]
+        if self._analysis_db is None:
+            return
+        
+        now = int(time.time())
+        try:
+            with self._db_lock:
+                self._analysis_db.executemany(
+                    'INSERT INTO semantic_analysis(embedding, json, ts) VALUES (?, ?, ?)',
+                    [(embedding.tobytes(), _JSON_ENCODER.encode(analysis), now)
+                     for embedding, analysis in entries]
+                )
+                self._analysis_db.commit()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Could not store semantic cache entries: {e}")
+    
+    def _analysis_cache_key(self, email):
+        """Hash of the email fields the model sees, normalized for cache hits"""
+        text = '|'.join([
+            email['sender'].strip().lower(),
+            email['subject'].strip().lower(),
+            email['body'][:MAX_BODY_CHARS]
+        ])
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def _prefilter(self, email):
+        """Classify obvious automated and marketing emails without the model"""
+        if _AUTO_SENDER_RE.search(email['sender']):
             return EmailAnalysis(
-                needs_response=result['needs_response'],
-                response_priority=result['response_priority'],
-                email_type=result['email_type'],
-                reasoning=result['reasoning'],
-                suggested_response=result['suggested_response'],
-                meeting_request=meeting_request
+                needs_response=False,
+                response_priority="low",
+                email_type="automated",
+                reasoning="Sent from an automated address",
+                suggested_response=""
             )
-            
-        except Exception as e:
-            print(f"Error analyzing email: {e}")
+        
+        if email.get('auto_submitted'):
+            return EmailAnalysis(
+                needs_response=False,
+                response_priority="low",
+                email_type="automated",
+                reasoning="Automatic message (Auto-Submitted header), e.g. an out-of-office reply",
+                suggested_response=""
+            )
+        
+        if _SPAM_SUBJECT_RE.search(email['subject']):
+            return EmailAnalysis(
+                needs_response=False,
+                response_priority="low",
+                email_type="marketing",
+                reasoning="Subject looks like a newsletter or promotion",
+                suggested_response=""
+            )
+        
+        if email.get('list_unsubscribe'):
             return EmailAnalysis(
                 needs_response=False,
                 response_priority="low",
-                email_type="unknown",
-                reasoning="Error in analysis",
-                suggested_response="",
-                meeting_request=None
+                email_type="marketing",
+                reasoning="Sent to a mailing list (has a List-Unsubscribe header)",
+                suggested_response=""
             )
+        
+        return None
     
-    def check_calendar_availability_dt(self, requested_dt, duration_minutes):
-        """Check if requested datetime slot is available"""
+    async def _analyze_with_model(self, emails):
+        """Ask the model to analyze emails in one request, in input order.
+        
+        Emails that could not be analyzed get None.
+        """
+        email_list = [
+            {
+                "idx": idx,
+                "subject": email['subject'],
+                "from": email['sender'],
+                "body": _compact_body(email['body'])[:MAX_BODY_CHARS]
+            }
+            for idx, email in enumerate(emails)
+        ]
+        
+        # Only this message varies between requests; the static instructions
+        # live in the system message so they form a cacheable prompt prefix
+        user_msg = _JSON_ENCODER.encode(email_list).decode('utf-8')
+        
+        request = dict(
+            model=ANALYSIS_MODEL,
+            messages=[
+                {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                {"role": "user", "content": user_msg}
+            ],
+            temperature=0.1,
+            max_tokens=ANALYSIS_MAX_TOKENS_PER_EMAIL * len(emails),
+            response_format=ANALYSIS_RESPONSE_FORMAT
+        )
+        
         try:
-            # Check calendar for conflicts
-            end_dt = requested_dt + timedelta(minutes=duration_minutes)
+            if self.stream_completions and len(emails) == 1:
+                # A lone email's outcome is known once needs_response is
+                # streamed, so stop there if it is false
+                response_text, match = await self._complete_until(
+                    _EARLY_NO_RESPONSE_RE.search, **request
+                )
+                if match:
+                    return [EmailAnalysis(
+                        needs_response=False,
+                        response_priority=match.group(2),
+                        email_type=match.group(1),
+                        reasoning="Classified as not needing a response",
+                        suggested_response=""
+                    )]
+            else:
+                response_text = await self._complete_text(**request)
+            
+            batch = _BATCH_DECODER.decode(response_text)
+            results = sorted(batch.results, key=lambda r: r.idx)
             
-            events_result = self.calendar_service.events().list(
-                calendarId='primary',
-                timeMin=requested_dt.isoformat() + 'Z',
-                timeMax=end_dt.isoformat() + 'Z',
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+        except Exception as e:
+            log.error(f"Error analyzing emails: {e}")
+            return [None] * len(emails)
+        
+        analyses = [None] * len(emails)
+        for result in results:
+            if 0 <= result.idx < len(emails) and analyses[result.idx] is None:
+                analyses[result.idx] = result.analysis
+        
+        return analyses
+    
+    async def _complete_text(self, **kwargs):
+        """Run a chat completion and return the full response text"""
+        async with self._openai_slot():
+            if not self.stream_completions:
+                response = await self.async_openai_client.chat.completions.create(**kwargs)
+                return response.choices[0].message.content
             
-            events = events_result.get('items', [])
+            return ''.join([chunk async for chunk in self._stream_text(**kwargs)])
+    
+    async def _complete_until(self, stop_when, **kwargs):
+        """Stream a chat completion until stop_when(text so far) returns a match.
+        
+        Returns (text, match); match is None if the response was read to the
+        end. Stopping early closes the connection, so the remaining tokens
+        are never generated or billed.
+        """
+        async with self._openai_slot():
+            text = ''
+            chunks = self._stream_text(**kwargs)
+            try:
+                async for chunk in chunks:
+                    text += chunk
+                    match = stop_when(text)
+                    if match:
+                        return text, match
+            finally:
+                await chunks.aclose()
+            return text, None
+    
+    async def _stream_text(self, **kwargs):
+        """Stream a chat completion, yielding its text in coalesced chunks.
+        
+        Token deltas are buffered and yielded together once enough have
+        arrived or enough time has passed, rather than one object per token.
+        """
+        stream = await self.async_openai_client.chat.completions.create(stream=True, **kwargs)
+        
+        try:
+            buffer = []
+            last_flush = time.monotonic()
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    buffer.append(delta)
+                
+                if buffer and (len(buffer) >= STREAM_FLUSH_DELTAS or
+                               time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS):
+                    yield ''.join(buffer)
+                    buffer = []
+                    last_flush = time.monotonic()
             
+            if buffer:
+                yield ''.join(buffer)
+        finally:
+            # Release the connection even if the caller stops reading early
+            await stream.close()
+    
+    def _fallback_analysis(self):
+        """Analysis used when an email could not be analyzed"""
+        return EmailAnalysis(
+            needs_response=False,
+            response_priority="low",
+            email_type="unknown",
+            reasoning="Error in analysis",
+            suggested_response="",
+            meeting_request=None
+        )
+    
+    def _plan_analysis_batches(self, emails):
+        """Group emails into analysis batches of similar body length"""
+        bins = [[] for _ in ANALYSIS_BINS]
+        for email in emails:
+            length = len(email['body'][:MAX_BODY_CHARS])
+            for members, (max_chars, _) in zip(bins, ANALYSIS_BINS):
+                if max_chars is None or length <= max_chars:
+                    members.append(email)
+                    break
+        
+        batches = []
+        for members, (_, batch_size) in zip(bins, ANALYSIS_BINS):
+            for start in range(0, len(members), batch_size):
+                batches.append(members[start:start + batch_size])
+        return batches
+    
+    def check_calendar_availability_dt(self, requested_dt, duration_minutes):
+        """Check if requested datetime slot is available"""
+        try:
             # If no conflicts, time is available
-            if not events:
+            end_dt = requested_dt + timedelta(minutes=duration_minutes)
+            if self._slot_is_free(requested_dt, end_dt):
                 return True, []
             
             # If conflicts, suggest alternative times
@@ -290,7 +1235,7 @@ class SmartEmailResponder:
             return False, alternatives
             
         except Exception as e:
-            print(f"Error checking availability: {e}")
+            log.error(f"Error checking availability: {e}")
             return False, []
 
     def check_calendar_availability(self, date_str, time_str, duration_minutes):
@@ -298,8 +1243,7 @@ class SmartEmailResponder:
         try:
             # Parse the requested datetime
             if date_str and time_str:
-                datetime_str = f"{date_str} {time_str}"
-                requested_dt = date_parser.parse(datetime_str)
+                requested_dt = self._parse_date_time(date_str, time_str)
             else:
                 # Default to next business day at 2 PM if no specific time
                 requested_dt = self._get_next_business_day()
@@ -308,69 +1252,151 @@ class SmartEmailResponder:
             return self.check_calendar_availability_dt(requested_dt, duration_minutes)
             
         except Exception as e:
-            print(f"Error checking availability: {e}")
+            log.error(f"Error checking availability: {e}")
             return False, []
     
     def _is_within_working_hours(self, dt):
         """Check if datetime is within working hours"""
-        return (dt.weekday() in self.working_hours['days'] and 
+        return (self._is_workday(dt) and 
                 self.working_hours['start'] <= dt.hour < self.working_hours['end'])
     
+    def _is_workday(self, dt):
+        """Check if datetime falls on a working day"""
+        return bool((self._workdays_mask >> dt.weekday()) & 1)
+    
     def _get_next_business_day(self):
-        """Get next business day"""
+        """Get next business day (computed once per run)"""
+        if self._next_bday is not None:
+            return self._next_bday
+        
         today = datetime.now()
         days_ahead = 1
         
         while True:
             next_day = today + timedelta(days=days_ahead)
-            if next_day.weekday() in self.working_hours['days']:
+            if self._is_workday(next_day):
+                self._next_bday = next_day
                 return next_day
             days_ahead += 1
     
     def _suggest_alternative_times(self, requested_dt, duration_minutes):
         """Suggest 2 alternative time slots"""
-        alternatives = []
-        
-        # Try same day, different times
+        # Same day at different times, then the next few business days at 2 PM
         base_date = requested_dt.date()
-        for hour in [10, 11, 14, 15, 16]:
-            alt_dt = datetime.combine(base_date, datetime.min.time().replace(hour=hour))
-            if self._is_time_slot_free(alt_dt, duration_minutes):
-                alternatives.append(alt_dt)
-                if len(alternatives) >= 2:
-                    return alternatives
-        
-        # Try next few business days
-        for days_ahead in range(1, 8):
-            next_date = base_date + timedelta(days=days_ahead)
-            next_dt = datetime.combine(next_date, datetime.min.time().replace(hour=14))
-            
-            if (next_dt.weekday() in self.working_hours['days'] and 
-                self._is_time_slot_free(next_dt, duration_minutes)):
-                alternatives.append(next_dt)
-                if len(alternatives) >= 2:
-                    break
+        same_day = [
+            datetime.combine(base_date, datetime.min.time().replace(hour=hour))
+            for hour in [10, 11, 14, 15, 16]
+        ]
+        next_days = [
+            datetime.combine(base_date + timedelta(days=days_ahead), datetime.min.time().replace(hour=14))
+            for days_ahead in range(1, 8)
+        ]
+        candidates = same_day + [dt for dt in next_days if self._is_workday(dt)]
         
-        return alternatives[:2]
+        free = (dt for dt in candidates if self._is_time_slot_free(dt, duration_minutes))
+        return list(islice(free, 2))
     
     def _is_time_slot_free(self, dt, duration_minutes):
         """Check if a specific time slot is free"""
         try:
-            end_dt = dt + timedelta(minutes=duration_minutes)
+            return self._slot_is_free(dt, dt + timedelta(minutes=duration_minutes))
+        except Exception:
+            return False
+    
+    def _slot_is_free(self, start_dt, end_dt):
+        """Check a slot against the busy intervals by bisection"""
+        with self._calendar_lock:
+            starts, ends = self._busy_between(start_dt, end_dt)
+            # The first busy interval ending after the slot starts is the only
+            # one that can overlap it
+            i = bisect.bisect_right(ends, start_dt)
+            return i == len(starts) or starts[i] >= end_dt
+    
+    def _busy_between(self, start_dt, end_dt):
+        """Get busy intervals covering a time range as (starts, ends), loading a new window if needed"""
+        with self._calendar_lock:
+            if self._busy_cache is not None:
+                window_start, window_end, starts, ends = self._busy_cache
+                if window_start <= start_dt and end_dt <= window_end:
+                    return starts, ends
             
-            events_result = self.calendar_service.events().list(
-                calendarId='primary',
-                timeMin=dt.isoformat() + 'Z',
-                timeMax=end_dt.isoformat() + 'Z',
-                singleEvents=True
-            ).execute()
+            window_start = datetime.combine(start_dt.date(), datetime.min.time())
+            window_end = max(end_dt, window_start + timedelta(days=BUSY_WINDOW_DAYS))
+            return self._load_busy(window_start, window_end)
+    
+    def _load_busy(self, time_min, time_max):
+        """Fetch busy intervals for a time range with a single freebusy query"""
+        result = self._execute(self.calendar_service.freebusy().query(body={
+            'timeMin': time_min.isoformat() + 'Z',
+            'timeMax': time_max.isoformat() + 'Z',
+            'items': [{'id': 'primary'}]
+        }))
+        
+        starts, ends = [], []
+        self._busy_cache = (time_min, time_max, starts, ends)
+        for interval in result['calendars']['primary'].get('busy', []):
+            self._mark_busy(self._parse_utc(interval['start']), self._parse_utc(interval['end']))
+        for start_dt, end_dt in self._booked_slots:
+            self._mark_busy(start_dt, end_dt)
+        return starts, ends
+    
+    def _mark_busy(self, start_dt, end_dt):
+        """Record a booked slot, merging it into the busy intervals so later checks see it"""
+        with self._calendar_lock:
+            if self._busy_cache is None:
+                return
+            starts, ends = self._busy_cache[2:]
             
-            return len(events_result.get('items', [])) == 0
-        except:
-            return False
+            # Intervals in [lo, hi) touch or overlap the new one and merge with it
+            lo = bisect.bisect_left(ends, start_dt)
+            hi = bisect.bisect_right(starts, end_dt)
+            if lo < hi:
+                start_dt = min(start_dt, starts[lo])
+                end_dt = max(end_dt, ends[hi - 1])
+            starts[lo:hi] = [start_dt]
+            ends[lo:hi] = [end_dt]
+    
+    def _book_slot(self, start_dt, end_dt):
+        """Reserve a slot for the rest of the run, including any busy window loaded later"""
+        with self._calendar_lock:
+            self._booked_slots.append((start_dt, end_dt))
+            self._mark_busy(start_dt, end_dt)
+    
+    def _parse_date_time(self, date_str, time_str):
+        """Parse a date and time, trying ISO 8601 before falling back to dateutil"""
+        try:
+            return datetime.fromisoformat(f"{date_str}T{time_str}")
+        except ValueError:
+            return date_parser.parse(f"{date_str} {time_str}")
+    
+    def _parse_utc(self, value):
+        """Parse an RFC 3339 timestamp into a naive UTC datetime"""
+        return date_parser.isoparse(value).astimezone(timezone.utc).replace(tzinfo=None)
     
     def create_meeting_if_available(self, meeting_request, sender_email, email_subject=None, email_body=None):
         """Create meeting if time is available, otherwise suggest alternatives"""
+        event, meeting_info = self._plan_meeting(meeting_request, sender_email, email_subject, email_body)
+        if event is None:
+            return False, meeting_info
+        
+        try:
+            created_event = self._execute(self.calendar_service.events().insert(
+                calendarId='primary', 
+                body=event,
+                sendNotifications=True  # This ensures calendar invites are sent!
+            ))
+            self._report_event_created(created_event, event)
+            return True, meeting_info
+        except Exception as e:
+            log.error(f"Error in meeting creation: {e}")
+            return False, self._fallback_meeting_suggestion()
+    
+    def _plan_meeting(self, meeting_request, sender_email, email_subject=None, email_body=None):
+        """Work out the calendar event for a meeting request without creating it.
+        
+        Returns (event, meeting_info). event is None when the requested time
+        is not available, in which case meeting_info suggests alternatives.
+        """
         try:
             # Determine meeting time with proper date parsing
             if meeting_request.preferred_date and meeting_request.preferred_time:
@@ -379,39 +1405,20 @@ class SmartEmailResponder:
                     # Get tomorrow's date
                     tomorrow = datetime.now() + timedelta(days=1)
                     try:
-                        # Parse time (handle formats like "19:00", "7pm", "7:00 PM")
-                        time_str = meeting_request.preferred_time.lower().replace(" ", "")
-                        if "pm" in time_str:
-                            time_str = time_str.replace("pm", "")
-                            hour = int(time_str.split(":")[0])
-                            if hour != 12:
-                                hour += 12
-                            minute = int(time_str.split(":")[1]) if ":" in time_str else 0
-                        elif "am" in time_str:
-                            time_str = time_str.replace("am", "")
-                            hour = int(time_str.split(":")[0])
-                            minute = int(time_str.split(":")[1]) if ":" in time_str else 0
-                        else:
-                            # 24-hour format like "19:00"
-                            if ":" in meeting_request.preferred_time:
-                                hour = int(meeting_request.preferred_time.split(":")[0])
-                                minute = int(meeting_request.preferred_time.split(":")[1])
-                            else:
-                                hour = int(meeting_request.preferred_time)
-                                minute = 0
-                        
+                        hour, minute = _parse_clock(meeting_request.preferred_time)
                         start_dt = tomorrow.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                        print(f"🗓️ Parsed 'tomorrow {meeting_request.preferred_time}' as: {start_dt}")
+                        log.info(f"🗓️ Parsed 'tomorrow {meeting_request.preferred_time}' as: {start_dt}")
                         
                     except Exception as e:
-                        print(f"⚠️ Error parsing time '{meeting_request.preferred_time}': {e}")
+                        log.warning(f"⚠️ Error parsing time '{meeting_request.preferred_time}': {e}")
                         # Default to tomorrow 7 PM if parsing fails
                         start_dt = tomorrow.replace(hour=19, minute=0, second=0, microsecond=0)
                 else:
                     # Try parsing other date formats
                     try:
-                        datetime_str = f"{meeting_request.preferred_date} {meeting_request.preferred_time}"
-                        start_dt = date_parser.parse(datetime_str)
+                        start_dt = self._parse_date_time(
+                            meeting_request.preferred_date, meeting_request.preferred_time
+                        )
                         # Ensure it's not in the past
                         if start_dt < datetime.now():
                             start_dt = start_dt.replace(year=datetime.now().year + 1)
@@ -422,18 +1429,26 @@ class SmartEmailResponder:
                 # Default to next business day at 2 PM if no specific time
                 start_dt = self._get_next_business_day().replace(hour=14, minute=0, second=0, microsecond=0)
             
-            # Check availability using the parsed datetime
-            available, alternatives = self.check_calendar_availability_dt(
-                start_dt,
-                meeting_request.duration_minutes
-            )
+            # Check availability using the parsed datetime. A free slot is
+            # reserved right away so concurrently handled emails can't book it too
+            with self._calendar_lock:
+                available, alternatives = self.check_calendar_availability_dt(
+                    start_dt,
+                    meeting_request.duration_minutes
+                )
+                if available:
+                    self._book_slot(
+                        start_dt, start_dt + timedelta(minutes=meeting_request.duration_minutes)
+                    )
             
-            print(f"🕐 Meeting time: {start_dt}")
-            print(f"📅 Available: {available}")
-            print(f"🔄 Alternatives: {len(alternatives) if alternatives else 0}")
+            self._log_block(
+                f"🕐 Meeting time: {start_dt}",
+                f"📅 Available: {available}",
+                f"🔄 Alternatives: {len(alternatives) if alternatives else 0}"
+            )
             
             if available:
-                # Create the actual calendar event
+                # Build the actual calendar event
                 end_dt = start_dt + timedelta(minutes=meeting_request.duration_minutes)
                 
                 # Clean up attendee emails
@@ -448,7 +1463,7 @@ class SmartEmailResponder:
                     if email and '@' in email:
                         attendee_emails.append({'email': email.strip()})
                 
-                print(f"📧 Creating event for attendees: {[att['email'] for att in attendee_emails]}")
+                log.info(f"📧 Creating event for attendees: {[att['email'] for att in attendee_emails]}")
                 
                 # Generate meaningful meeting subject
                 meeting_subject = self._generate_meeting_subject(
@@ -477,16 +1492,7 @@ class SmartEmailResponder:
                     'status': 'confirmed'
                 }
                 
-                created_event = self.calendar_service.events().insert(
-                    calendarId='primary', 
-                    body=event,
-                    sendNotifications=True  # This ensures calendar invites are sent!
-                ).execute()
-                
-                event_id = created_event.get('id')
-                print(f"✅ Calendar event created: {event_id}")
-                print(f"📧 Calendar invites sent to: {[att['email'] for att in attendee_emails]}")
-                return True, f"Meeting scheduled for {start_dt.strftime('%B %d, %Y at %I:%M %p')}"
+                return event, f"Meeting scheduled for {start_dt.strftime('%B %d, %Y at %I:%M %p')}"
                 
             else:
                 # Suggest alternatives
@@ -495,28 +1501,30 @@ class SmartEmailResponder:
                         f"• {alt.strftime('%B %d, %Y at %I:%M %p')}" 
                         for alt in alternatives
                     ])
-                    return False, f"The requested time is not available. Here are some alternatives:\n{alt_text}"
+                    return None, f"The requested time is not available. Here are some alternatives:\n{alt_text}"
                 else:
-                    return False, "No suitable alternative times found this week."
+                    return None, "No suitable alternative times found this week."
                     
         except Exception as e:
-            print(f"Error in meeting creation: {e}")
-            # Still try to suggest a time even if calendar creation fails
-            next_day = self._get_next_business_day().replace(hour=14, minute=0)
-            return False, f"I'd be happy to meet. How about {next_day.strftime('%B %d, %Y at %I:%M %p')}?"
+            log.error(f"Error in meeting creation: {e}")
+            return None, self._fallback_meeting_suggestion()
+    
+    def _fallback_meeting_suggestion(self):
+        """Suggest a time even when the meeting could not be scheduled"""
+        next_day = self._get_next_business_day().replace(hour=14, minute=0)
+        return f"I'd be happy to meet. How about {next_day.strftime('%B %d, %Y at %I:%M %p')}?"
+    
+    def _report_event_created(self, created_event, event):
+        """Print confirmation for a created calendar event"""
+        self._log_block(
+            f"✅ Calendar event created: {created_event.get('id')}",
+            f"📧 Calendar invites sent to: {[att['email'] for att in event['attendees']]}"
+        )
     
     def create_draft_response(self, email, analysis):
         """Create a draft response in Gmail"""
         try:
-            # Extract sender name from email address
-            sender_name = self._extract_sender_name(email['sender'])
-            
-            # Start with a proper greeting
-            response_body = f"Hi {sender_name},\n\n"
-            
-            # Add the main response content
-            if analysis.suggested_response:
-                response_body += analysis.suggested_response + "\n\n"
+            meeting_created, meeting_info = False, None
             
             # Handle meeting requests - ACTUALLY CREATE CALENDAR EVENTS
             if analysis.meeting_request:
@@ -526,37 +1534,100 @@ class SmartEmailResponder:
                     email['subject'],  # Pass email subject for better meeting titles
                     email['body']      # Pass email body for context extraction
                 )
-                
-                if meeting_created:
-                    response_body += f"{meeting_info}. I've sent you a calendar invite.\n\n"
-                else:
-                    response_body += f"{meeting_info}\n\n"
-            
-            # Add professional closing
-            response_body += "Best regards,\n[Your Name]"
             
-            # Create draft message
-            message = {
-                'message': {
-                    'threadId': email['thread_id'],
-                    'raw': self._create_message_raw(
-                        to=email['sender'],
-                        subject=f"Re: {email['subject']}",
-                        body=response_body
-                    )
-                }
-            }
-            
-            draft = self.gmail_service.users().drafts().create(
-                userId='me', body=message
-            ).execute()
+            draft = self._execute(self.gmail_service.users().drafts().create(
+                userId='me', body=self._draft_message(email, analysis, meeting_created, meeting_info)
+            ))
             
             return draft.get('id')
             
         except Exception as e:
-            print(f"Error creating draft: {e}")
+            log.error(f"Error creating draft: {e}")
             return None
     
+    def create_draft_responses(self, pairs):
+        """Create drafts for several (email, analysis) pairs with batch requests.
+        
+        Calendar events for all meeting requests are inserted in one batch,
+        then all drafts are created in another. Returns {email id: draft id},
+        with None for drafts that could not be created.
+        """
+        meeting_results = {}
+        events = {}
+        for email, analysis in pairs:
+            if analysis.meeting_request:
+                event, meeting_info = self._plan_meeting(
+                    analysis.meeting_request, email['sender'], email['subject'], email['body']
+                )
+                meeting_results[email['id']] = (False, meeting_info)
+                if event is not None:
+                    events[email['id']] = event
+        
+        if events:
+            created_events = self._execute_batch(self.calendar_service, {
+                email_id: self.calendar_service.events().insert(
+                    calendarId='primary', body=event, sendNotifications=True
+                )
+                for email_id, event in events.items()
+            })
+            for email_id, event in events.items():
+                created_event = created_events.get(email_id)
+                if created_event is not None:
+                    self._report_event_created(created_event, event)
+                    meeting_results[email_id] = (True, meeting_results[email_id][1])
+                else:
+                    meeting_results[email_id] = (False, self._fallback_meeting_suggestion())
+        
+        requests = {}
+        for email, analysis in pairs:
+            try:
+                meeting_created, meeting_info = meeting_results.get(email['id'], (False, None))
+                requests[email['id']] = self.gmail_service.users().drafts().create(
+                    userId='me', body=self._draft_message(email, analysis, meeting_created, meeting_info)
+                )
+            except Exception as e:
+                log.error(f"Error creating draft: {e}")
+        
+        drafts = self._execute_batch(self.gmail_service, requests) if requests else {}
+        return {
+            email['id']: (drafts.get(email['id']) or {}).get('id')
+            for email, _ in pairs
+        }
+    
+    def _draft_message(self, email, analysis, meeting_created=False, meeting_info=None):
+        """Build the Gmail draft resource replying to an email"""
+        # Extract sender name from email address
+        sender_name = self._extract_sender_name(email['sender'])
+        
+        # Start with a proper greeting
+        response_body = f"Hi {sender_name},\n\n"
+        
+        # Add the main response content
+        if analysis.suggested_response:
+            response_body += analysis.suggested_response + "\n\n"
+        
+        # Add the outcome of any meeting request
+        if meeting_info:
+            if meeting_created:
+                response_body += f"{meeting_info}. I've sent you a calendar invite.\n\n"
+            else:
+                response_body += f"{meeting_info}\n\n"
+        
+        # Add professional closing
+        response_body += "Best regards,\n[Your Name]"
+        
+        # Create draft message
+        return {
+            'message': {
+                'threadId': email['thread_id'],
+                'raw': self._create_message_raw(
+                    to=email['sender'],
+                    subject=f"Re: {email['subject']}",
+                    body=response_body
+                )
+            }
+        }
+    
     def _extract_sender_name(self, sender_email):
         """Extract a friendly name from sender email"""
         # Handle formats like "John Doe <john@example.com>" or just "john@example.com"
@@ -583,97 +1654,23 @@ class SmartEmailResponder:
             if subject.lower().startswith('re:'):
                 subject = subject[3:].strip()
             
-            # Check if subject is vague/generic
-            vague_subjects = [
-                'meeting', 'send meeting invite', 'calendar invite', 'schedule meeting',
-                'let\'s meet', 'meeting request', 'invitation', 'catch up', 'chat',
-                'quick call', 'sync', 'touch base', 'follow up', 'let\'s schedule',
-                'schedule a call', 'call', 'discussion', 'talk', 'connect'
-            ]
-            
-            is_vague = any(vague.lower() in subject.lower() for vague in vague_subjects)
-            
-            # If subject is not vague, use it directly
-            if not is_vague:
+            # If subject is not vague/generic, use it directly
+            if not _VAGUE_SUBJECT_RE.search(subject):
                 return subject
         
-        # Step 2: If subject is vague, derive context from email content
+        # Step 2: If subject is vague, use the title the model suggested
+        # while analyzing the email
+        meeting_subject = meeting_request.meeting_subject.strip().strip('"')
+        if len(meeting_subject) > 5:
+            return meeting_subject
+        
+        # Step 3: Fall back to the meeting purpose
         if meeting_request.purpose and len(meeting_request.purpose.strip()) > 10:
             purpose = meeting_request.purpose.strip()
-            
-            # Use AI to create a concise meeting title from the purpose
-            try:
-                context_prompt = f"""
-                Create a concise, professional meeting subject line (max 60 characters) from this meeting request:
-                
-                "{purpose}"
-                
-                Rules:
-                - Make it specific and actionable
-                - Don't start with "Meeting:" or "Meeting about"
-                - Focus on the main topic/goal
-                - Use title case
-                - Examples: "Q4 Budget Review", "Product Launch Strategy", "Team Performance Discussion"
-                
-                Return only the subject line, nothing else.
-                """
-                
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "You are an expert at creating concise, professional meeting titles."},
-                        {"role": "user", "content": context_prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=50
-                )
-                
-                ai_subject = response.choices[0].message.content.strip().strip('"')
-                if ai_subject and len(ai_subject) > 5:
-                    return ai_subject
-                    
-            except Exception as e:
-                print(f"Error generating AI subject: {e}")
-                # Fallback to cleaned purpose
-                if purpose.lower().startswith('meeting'):
-                    return purpose
-                else:
-                    return f"Meeting: {purpose}"
-        
-        # Step 3: Try to extract context from email body if available
-        if email_body and len(email_body.strip()) > 20:
-            try:
-                body_context_prompt = f"""
-                Extract the main topic/purpose for a meeting from this email content and create a concise meeting subject (max 60 characters):
-                
-                Email: "{email_body[:500]}"
-                
-                Rules:
-                - Focus on the business purpose/topic
-                - Make it specific and professional
-                - Don't start with "Meeting:" 
-                - Use title case
-                - Examples: "Project Status Review", "Contract Discussion", "Team Sync"
-                
-                Return only the subject line, nothing else.
-                """
-                
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "You are an expert at extracting meeting topics from email content."},
-                        {"role": "user", "content": body_context_prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=50
-                )
-                
-                body_subject = response.choices[0].message.content.strip().strip('"')
-                if body_subject and len(body_subject) > 5:
-                    return body_subject
-                    
-            except Exception as e:
-                print(f"Error extracting context from body: {e}")
+            if purpose.lower().startswith('meeting'):
+                return purpose
+            else:
+                return f"Meeting: {purpose}"
         
         # Step 4: Fallback to sender-based format
         sender_name = self._extract_sender_name(sender_email)
@@ -683,57 +1680,115 @@ class SmartEmailResponder:
     
     def _create_message_raw(self, to, subject, body):
         """Create raw email message"""
-        import email.mime.text
-        import email.mime.multipart
-        
-        msg = email.mime.multipart.MIMEMultipart()
-        msg['to'] = to
-        msg['subject'] = subject
-        
-        msg.attach(email.mime.text.MIMEText(body, 'plain'))
+        msg = EmailMessage()
+        msg['To'] = to
+        msg['Subject'] = subject
+        msg.set_content(body)
         
         return base64.urlsafe_b64encode(msg.as_bytes()).decode()
     
     def run(self):
         """Main function to process unread emails"""
-        print("Getting unread emails...")
+        asyncio.run(self.run_async())
+    
+    async def run_async(self):
+        """Process all unread emails concurrently"""
+        log.info("Getting unread emails...")
         emails = self.get_unread_emails()
+        self._busy_cache = None
+        self._booked_slots = []
+        self._next_bday = None
+        self._llm_calls_saved = 0
         
         if not emails:
-            print("No unread emails found.")
+            log.info("No unread emails found.")
             return
         
+        batches = self._plan_analysis_batches(emails)
+        # A batch that fails outright must not take the other batches' results with it
+        batch_results = await asyncio.gather(
+            *(self._process_batch(batch) for batch in batches), return_exceptions=True
+        )
+        await self._close_openai_client()
+        
         responses_created = 0
         meetings_created = 0
         
-        for email in emails:
-            print(f"\\nAnalyzing: {email['subject'][:50]}...")
-            
-            # Analyze email with reasoning
-            analysis = self.analyze_email_with_reasoning(email)
-            
-            print(f"Type: {analysis.email_type}")
-            print(f"Needs response: {analysis.needs_response}")
-            
-            if analysis.needs_response:
-                print(f"Priority: {analysis.response_priority}")
-                print(f"Reasoning: {analysis.reasoning}")
-                
-                # Create draft response
-                draft_id = self.create_draft_response(email, analysis)
-                
+        for batch, results in zip(batches, batch_results):
+            if isinstance(results, Exception):
+                log.error(f"Error processing {len(batch)} emails: {results}")
+                continue
+            for analysis, draft_id in results:
                 if draft_id:
-                    print("✅ Draft response created")
                     responses_created += 1
                     
                     if analysis.meeting_request:
                         meetings_created += 1
-                else:
-                    print("❌ Failed to create draft")
-            else:
-                print(f"Skipped: {analysis.reasoning}")
         
-        print(f"\\nDone! Created {responses_created} draft responses and {meetings_created} meetings.")
+        log.info(f"\nDone! Created {responses_created} draft responses and {meetings_created} meetings.")
+        if self._llm_calls_saved:
+            log.info(f"Reused or skipped AI analysis for {self._llm_calls_saved} emails.")
+    
+    async def _process_batch(self, emails):
+        """Analyze a batch of emails together, then draft responses for them"""
+        # Emails drafted on an earlier run are not analyzed, drafted (or
+        # booked) again; their drafts outlive any stored analysis
+        existing = self._load_draft_ids([email['id'] for email in emails])
+        self._llm_calls_saved += len(existing)
+        fresh = [email for email in emails if email['id'] not in existing]
+        
+        # Analyze emails with reasoning
+        analyses = {}
+        if fresh:
+            analyses = dict(zip(
+                [email['id'] for email in fresh], await self.analyze_emails_batch(fresh)
+            ))
+        
+        # Create draft responses (and any meetings) with batched API calls
+        to_answer = [
+            (email, analyses[email['id']]) for email in fresh
+            if analyses[email['id']].needs_response
+        ]
+        draft_ids = {}
+        if to_answer:
+            draft_ids = await self._run_blocking(self.create_draft_responses, to_answer)
+            self._store_draft_ids({
+                email_id: draft_id for email_id, draft_id in draft_ids.items() if draft_id
+            })
+        
+        results = []
+        for email in emails:
+            if email['id'] in existing:
+                self._log_block(
+                    f"\nAnalyzing: {email['subject'][:50]}...",
+                    "↩️ Draft response already created on an earlier run"
+                )
+                results.append((None, None))
+                continue
+            analysis = analyses[email['id']]
+            draft_id = draft_ids.get(email['id'])
+            self._report_email(email, analysis, draft_id)
+            results.append((analysis, draft_id))
+        return results
+    
+    def _report_email(self, email, analysis, draft_id):
+        """Print the outcome for one email as a single block"""
+        lines = [
+            f"\nAnalyzing: {email['subject'][:50]}...",
+            f"Type: {analysis.email_type}",
+            f"Needs response: {analysis.needs_response}"
+        ]
+        if analysis.needs_response:
+            lines.append(f"Priority: {analysis.response_priority}")
+            lines.append(f"Reasoning: {analysis.reasoning}")
+            lines.append("✅ Draft response created" if draft_id else "❌ Failed to create draft")
+        else:
+            lines.append(f"Skipped: {analysis.reasoning}")
+        self._log_block(*lines)
+    
+    def _log_block(self, *lines):
+        """Log lines as one record, so output from other threads can't split them"""
+        log.info("\n".join(lines))
 
 
 def main():
@@ -764,6 +1819,12 @@ Examples:
     
     args = parser.parse_args()
     
+    # Status output goes through logging; show it as plain lines on stdout
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    
     # Check environment
     if not os.getenv('OPENAI_API_KEY'):
         print("Error: Please set OPENAI_API_KEY in your .env file")